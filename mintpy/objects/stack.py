@@ -138,6 +138,12 @@ datasetUnitDict = {
     'intensity' : '1',
 }
 
+# HDF5 raw data chunk cache used while reading the whole 3D dataset,
+# large enough to hold multiple (compressed) chunks instead of the default 1 MB
+chunkCacheNbytes = 256 * 1024**2
+chunkCacheNslots = 10007
+chunkCacheW0 = 0.75
+
 
 
 ################################ timeseries class begin ################################
@@ -721,7 +727,7 @@ class ifgramStack:
         self.numPixel = self.length * self.width
 
         # time info
-        self.date12List = ['{}_{}'.format(i, j) for i, j in zip(self.mDates, self.sDates)]
+        self.date12List = self.date2date12(np.stack([self.mDates, self.sDates], axis=1))
         self.tbaseIfgram = np.array([i.days + i.seconds / (24 * 60 * 60)
                                      for i in (self.sTimes - self.mTimes)],
                                     dtype=np.float32)
@@ -895,28 +901,56 @@ class ifgramStack:
             maskFile = None
 
         # calculation
-        with h5py.File(self.file, 'r') as f:
+        with h5py.File(self.file, 'r',
+                       rdcc_nbytes=chunkCacheNbytes,
+                       rdcc_nslots=chunkCacheNslots,
+                       rdcc_w0=chunkCacheW0) as f:
             dset = f[datasetName]
             numIfgram = dset.shape[0]
+            if box is None:
+                box = (0, 0, dset.shape[2], dset.shape[1])
             dmean = np.zeros((numIfgram), dtype=np.float32)
 
+            # read in blocks aligned with the HDF5 chunk size along the 1st dimension,
+            # so that each compressed chunk is decompressed only once
+            slice_size = (box[3] - box[1]) * (box[2] - box[0])
+            step = dset.chunks[0] if dset.chunks else 1
+            step = max(1, min(step, int(0.5 * 1024**3 / 4 / slice_size)))  # up to 0.5 GB per block
+
+            # pre-allocate the buffer and read into it directly, to avoid allocation per block
+            data = np.empty((step, box[3]-box[1], box[2]-box[0]), dtype=np.float32)
+            if maskFile:
+                maskFlag = mask.flatten() != 0
+
             prog_bar = ptime.progressBar(maxValue=numIfgram)
-            for i in range(numIfgram):
-                prog_bar.update(i+1, suffix='{}/{}'.format(i+1, numIfgram))
+            for i0 in range(0, numIfgram, step):
+                i1 = min(i0 + step, numIfgram)
+                prog_bar.update(i1, suffix='{}/{}'.format(i1, numIfgram))
 
                 # read
-                data = dset[i, box[1]:box[3], box[0]:box[2]]
+                block = data[:i1-i0]
+                dset.read_direct(block,
+                                 source_sel=np.s_[i0:i1, box[1]:box[3], box[0]:box[2]],
+                                 dest_sel=np.s_[:i1-i0])
+                # flag valid pixels on the reused buffer, in 2D matrix of (num_ifgram, num_pixel)
+                block = block.reshape(i1-i0, -1)
+                valid = ~np.isnan(block)
                 if maskFile:
-                    data[mask == 0] = np.nan
+                    valid &= maskFlag
 
                 # ignore ZERO value for coherence
                 if datasetName == 'coherence':
-                    data[data == 0] = np.nan
+                    valid &= block != 0
 
                 if useMedian:
-                    dmean[i] = np.nanmedian(data)
+                    block[~valid] = np.nan
+                    dmean[i0:i1] = np.nanmedian(block, axis=1)
                 else:
-                    dmean[i] = np.nanmean(data)
+                    # accumulate in float64 to avoid the precision loss of float32 sum over large images
+                    num_valid = np.sum(valid, axis=1)
+                    dsum = np.sum(block, axis=1, where=valid, dtype=np.float64)
+                    with np.errstate(invalid='ignore', divide='ignore'):
+                        dmean[i0:i1] = np.where(num_valid > 0, dsum / num_valid, np.nan)
             prog_bar.close()
         return dmean, self.date12List
 
@@ -926,18 +960,25 @@ class ifgramStack:
             dates = f['date'][:]
             if dropIfgram:
                 dates = dates[f['dropIfgram'][:], :]
-        mDates = np.array([i.decode('utf8') for i in dates[:, 0]])
-        sDates = np.array([i.decode('utf8') for i in dates[:, 1]])
-        date12List = ['{}_{}'.format(i, j) for i, j in zip(mDates, sDates)]
+        date12List = self.date2date12(dates)
         return date12List
 
     def get_drop_date12_list(self):
         with h5py.File(self.file, 'r') as f:
             dates = f['date'][:]
             dates = dates[~f['dropIfgram'][:], :]
-        mDates = np.array([i.decode('utf8') for i in dates[:, 0]])
-        sDates = np.array([i.decode('utf8') for i in dates[:, 1]])
-        date12List = ['{}_{}'.format(i, j) for i, j in zip(mDates, sDates)]
+        date12List = self.date2date12(dates)
+        return date12List
+
+    @staticmethod
+    def date2date12(dates):
+        """Convert date pairs into list of date12 strings, with vectorized numpy.char operations
+        Parameters: dates      : 2D np.ndarray of bytes (from the date dataset) or str in size of (num_ifgram, 2)
+        Returns:    date12List : list of str, e.g. ['20161020_20161026', ...]
+        """
+        if dates.dtype.kind == 'S':
+            dates = np.char.decode(dates, 'utf8')
+        date12List = np.char.add(np.char.add(dates[:, 0], '_'), dates[:, 1]).tolist()
         return date12List
 
     def get_date_list(self, dropIfgram=False):
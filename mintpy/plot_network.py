@@ -9,6 +9,8 @@
 import os
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+import h5py
 import numpy as np
 import matplotlib.pyplot as plt
 from mintpy.objects import ifgramStack
@@ -37,6 +39,9 @@ EXAMPLE = """example:
   plot_network.py inputs/ifgramStack.h5
   plot_network.py inputs/ifgramStack.h5 -t smallbaselineApp.cfg --nodisplay   #Save figures to files without display
   plot_network.py inputs/ifgramStack.h5 -t smallbaselineApp.cfg --show-kept   #Do not plot dropped ifgrams
+  plot_network.py inputs/ifgramStack.h5 --nocoh --nodisplay                    #Skip coherence calculation
+  plot_network.py inputs/ifgramStack.h5 --list --nodisplay                     #Save date12_list.txt without plotting
+  plot_network.py inputs/ifgramStack.h5 --nodisplay --figext .png              #Save figures in PNG format
   plot_network.py coherenceSpatialAvg.txt
 
   # offsetSNR
@@ -61,9 +66,15 @@ def create_parser():
                         help='display kept interferograms only, without dropped interferograms')
     parser.add_argument('-d', '--dset', type=str, dest='dsetName', default='coherence',
                         help='dataset used to calculate the mean')
+    parser.add_argument('--list', dest='save_list', action='store_true',
+                        help='save the list of kept interferograms into text file: date12_list.txt\n'
+                             'no figure is plotted if used with --nodisplay but without --save')
 
     # Display coherence
     coh = parser.add_argument_group('Display Coherence', 'Show coherence of each interferogram pair with color')
+    coh.add_argument('--nocoh', '--no-coherence', dest='disp_coh', action='store_false',
+                     help='do not calculate/show the spatial average of the dataset (coherence by default),\n'
+                          'skipping the most time-consuming reading of the whole 3D dataset.')
     coh.add_argument('-t', '--template', dest='template_file',
                      help='template file with options below:\n'+TEMPLATE)
     coh.add_argument('-c', '--colormap', dest='cmap_name', default='RdBu_truncate',
@@ -91,6 +102,10 @@ def create_parser():
 
     fig.add_argument('--dpi', dest='fig_dpi', type=int, default=150,
                      help='DPI - dot per inch - for display/write')
+    fig.add_argument('--figext', dest='fig_ext', default='.pdf',
+                     choices=['.emf', '.eps', '.pdf', '.png', '.ps', '.raw', '.rgba', '.svg', '.svgz'],
+                     help='file extension to be saved, default: .pdf\n'
+                          '.png is smaller and faster to write for dense networks.')
     fig.add_argument('--figsize', dest='fig_size', type=float, nargs=2,
                      help='figure size in inches - width and length')
     fig.add_argument('--notitle', dest='disp_title', action='store_false',
@@ -111,18 +126,20 @@ def cmd_line_parse(iargs=None):
     parser = create_parser()
     inps = parser.parse_args(args=iargs)
 
+    # save the date12 list only, without plotting
+    inps.list_only = inps.save_list and not inps.save_fig and not inps.disp_fig
+
+    # switch to the non-interactive backend before any figure is created
+    if not inps.disp_fig:
+        inps.save_fig = not inps.list_only
+        plt.switch_backend('Agg')
+
     # check input file type
     if inps.file.endswith(('.h5','.he5')):
         k = readfile.read_attribute(inps.file)['FILE_TYPE']
         if k != 'ifgramStack':
             raise ValueError('input HDF5 file is NOT ifgramStack.')
 
-    if not inps.disp_fig:
-        inps.save_fig = True
-
-    if not inps.disp_fig:
-        plt.switch_backend('Agg')
-
     if inps.template_file:
         inps = read_template2inps(inps.template_file, inps)
     else:
@@ -182,21 +199,54 @@ def read_network_info(inps):
 
     ## 1. Read date, pbase, date12 and coherence
     if ext == '.h5':
-        inps.date12List = ifgramStack(inps.file).get_date12_list(dropIfgram=False)
-        inps.dateList = ifgramStack(inps.file).get_date_list(dropIfgram=False)
-        inps.pbaseList = ifgramStack(inps.file).get_perp_baseline_timeseries(dropIfgram=False)
-        inps.cohList = ut.spatial_average(inps.file,
-                                          datasetName=inps.dsetName,
-                                          maskFile=inps.maskFile,
-                                          saveList=True,
-                                          checkAoi=False)[0]
+        # read date/dropIfgram/bperp within one file access, and derive all network info from them
+        with h5py.File(inps.file, 'r') as f:
+            dates = f['date'][:]
+            dropIfgram = f['dropIfgram'][:]
+            pbase12List = f['bperp'][:]
+        inps.date12List = ifgramStack.date2date12(dates)
+        inps.dateList = np.unique(np.char.decode(dates, 'utf8')).tolist()
+
+        # pbase12List + date12List --> pbaseList
+        A = ifgramStack.get_design_matrix4timeseries(inps.date12List)[0]
+        inps.pbaseList = np.zeros(len(inps.dateList), dtype=np.float32)
+        inps.pbaseList[1:] = np.linalg.lstsq(A, pbase12List, rcond=None)[0]
+        if inps.disp_coh and not inps.list_only:
+            inps.cohList, cohDate12List = ut.spatial_average(inps.file,
+                                                             datasetName=inps.dsetName,
+                                                             maskFile=inps.maskFile,
+                                                             saveList=True,
+                                                             checkAoi=False)
+            # convert to array once, for the nan check and re-ordering below
+            cohArray = np.asarray(inps.cohList, dtype=np.float32)
+            if np.isnan(cohArray).all():
+                inps.cohList = None
+                print('WARNING: all coherence value are nan! Do not use this and continue.')
+        else:
+            inps.cohList, cohDate12List = None, inps.date12List
+
+        # re-order the coherence values to match date12List, as they could be read from an existing txt file
+        if inps.cohList is not None and cohDate12List != inps.date12List:
+            # locate each date12 in the sorted coherence date12 list
+            cohDate12Array = np.asarray(cohDate12List)
+            order = np.argsort(cohDate12Array)
+            date12Array = np.asarray(inps.date12List)
+            pos = np.searchsorted(cohDate12Array[order], date12Array)
+            pos = np.minimum(pos, cohDate12Array.size - 1)
+            idx = order[pos]
+
+            if np.all(cohDate12Array[idx] == date12Array):
+                print('extract coherence value for all pair/interferograms')
+                inps.cohList = cohArray[idx].tolist()
+            else:
+                inps.cohList = None
+                print('WARNING: not every pair/interferogram has coherence value! Do not use coherence and continue.')
     elif ext == '.txt':
         inps.date12List = np.loadtxt(inps.file, dtype=bytes).astype(str)[:,0].tolist()
 
         # date12List --> dateList
-        mDates = [i.split('_')[0] for i in inps.date12List]
-        sDates = [i.split('_')[1] for i in inps.date12List]
-        inps.dateList = sorted(list(set(mDates + sDates)))
+        date12Parts = np.char.partition(np.asarray(inps.date12List, dtype=str), '_')
+        inps.dateList = np.unique(np.concatenate([date12Parts[:, 0], date12Parts[:, 2]])).tolist()
 
         # pbase12List + date12List --> pbaseList
         pbase12List = np.loadtxt(inps.file, dtype=bytes).astype(float)[:,3]
@@ -205,7 +255,10 @@ def read_network_info(inps):
         inps.pbaseList[1:] = np.linalg.lstsq(A, np.array(pbase12List), rcond=None)[0]
 
         # cohList
-        inps.cohList = np.loadtxt(inps.file, dtype=bytes).astype(float)[:,1]
+        if inps.disp_coh:
+            inps.cohList = np.loadtxt(inps.file, dtype=bytes).astype(float)[:,1]
+        else:
+            inps.cohList = None
     else:
         raise ValueError('un-recognized input file extention:', ext)
     print('number of acquisitions: {}'.format(len(inps.dateList)))
@@ -215,74 +268,111 @@ def read_network_info(inps):
     inps.dateList_drop = []
     inps.date12List_drop = []
     if ext == '.h5':
-        inps.date12List_keep = ifgramStack(inps.file).get_date12_list(dropIfgram=True)
-        inps.date12List_drop = sorted(list(set(inps.date12List) - set(inps.date12List_keep)))
+        inps.date12List_keep = np.array(inps.date12List)[dropIfgram].tolist()
+        inps.date12List_drop = sorted(np.setdiff1d(inps.date12List, inps.date12List_keep, assume_unique=True).tolist())
         print('-'*50)
         print('number of interferograms marked as drop: {}'.format(len(inps.date12List_drop)))
         print('number of interferograms marked as keep: {}'.format(len(inps.date12List_keep)))
 
-        mDates = [i.split('_')[0] for i in inps.date12List_keep]
-        sDates = [i.split('_')[1] for i in inps.date12List_keep]
-        inps.dateList_keep = sorted(list(set(mDates + sDates)))
-        inps.dateList_drop = sorted(list(set(inps.dateList) - set(inps.dateList_keep)))
+        inps.dateList_keep = []
+        if inps.date12List_keep:
+            date12Parts = np.char.partition(np.asarray(inps.date12List_keep, dtype=str), '_')
+            mDates, sDates = date12Parts[:, 0], date12Parts[:, 2]
+            inps.dateList_keep = np.unique(np.concatenate([mDates, sDates])).tolist()
+        inps.dateList_drop = np.setdiff1d(inps.dateList, inps.dateList_keep, assume_unique=True).tolist()
         print('number of acquisitions marked as drop: {}'.format(len(inps.dateList_drop)))
         if len(inps.dateList_drop) > 0:
             print(inps.dateList_drop)
-    return inps
 
+    # Optional: save date12 list of kept interferograms
+    if inps.save_list:
+        txtFile = 'date12_list.txt'
+        date12List_keep = np.setdiff1d(inps.date12List, inps.date12List_drop, assume_unique=True)
+        np.savetxt(txtFile, date12List_keep, fmt='%s')
+        print('save list of kept interferograms to file: {}'.format(txtFile))
+    return inps
 
-##########################  Main Function  ##############################
-def main(iargs=None):
-    inps = cmd_line_parse(iargs)
 
-    # Plot
-    inps.cbar_label = 'Average Spatial Coherence'
-    figNames = [i+'.pdf' for i in ['bperpHistory', 'coherenceMatrix', 'coherenceHistory', 'network']]
+def plot_figure(inps, fig_name):
+    """Plot one figure of the network info and save it to file.
+    Parameters: inps     : Namespace, with network info from read_network_info()
+                fig_name : str, output figure file name, e.g. network.pdf, coherenceMatrix.png
+    Returns:    fig_name : str, output figure file name
+    """
+    # make sure the non-interactive backend is used in the worker process
+    if not inps.disp_fig and plt.get_backend().lower() != 'agg':
+        plt.switch_backend('Agg')
 
-    # Fig 1 - Baseline History
     fig, ax = plt.subplots(figsize=inps.fig_size)
-    ax = pp.plot_perp_baseline_hist(ax,
-                                    inps.dateList,
-                                    inps.pbaseList,
-                                    vars(inps),
-                                    inps.dateList_drop)
-    if inps.save_fig:
-        fig.savefig(figNames[0], bbox_inches='tight', transparent=True, dpi=inps.fig_dpi)
-        print('save figure to {}'.format(figNames[0]))
-
-    if inps.cohList is not None:
+    fig_type = os.path.splitext(fig_name)[0]
+    if fig_type == 'bperpHistory':
+        # Fig 1 - Baseline History
+        ax = pp.plot_perp_baseline_hist(ax,
+                                        inps.dateList,
+                                        inps.pbaseList,
+                                        vars(inps),
+                                        inps.dateList_drop)
+
+    elif fig_type == 'coherenceMatrix':
         # Fig 2 - Coherence Matrix
-        fig, ax = plt.subplots(figsize=inps.fig_size)
         ax = pp.plot_coherence_matrix(ax,
                                       inps.date12List,
                                       inps.cohList,
                                       inps.date12List_drop,
                                       p_dict=vars(inps))[0]
-        if inps.save_fig:
-            fig.savefig(figNames[1], bbox_inches='tight', transparent=True, dpi=inps.fig_dpi)
-            print('save figure to {}'.format(figNames[1]))
 
+    elif fig_type == 'coherenceHistory':
         # Fig 3 - Min/Max Coherence History
-        fig, ax = plt.subplots(figsize=inps.fig_size)
         ax = pp.plot_coherence_history(ax,
                                        inps.date12List,
                                        inps.cohList,
                                        p_dict=vars(inps))
-        if inps.save_fig:
-            fig.savefig(figNames[2], bbox_inches='tight', transparent=True, dpi=inps.fig_dpi)
-            print('save figure to {}'.format(figNames[2]))
 
-    # Fig 4 - Interferogram Network
-    fig, ax = plt.subplots(figsize=inps.fig_size)
-    ax = pp.plot_network(ax,
-                         inps.date12List,
-                         inps.dateList,
-                         inps.pbaseList,
-                         vars(inps),
-                         inps.date12List_drop)
+    elif fig_type == 'network':
+        # Fig 4 - Interferogram Network
+        ax = pp.plot_network(ax,
+                             inps.date12List,
+                             inps.dateList,
+                             inps.pbaseList,
+                             vars(inps),
+                             inps.date12List_drop)
+
+    fig.tight_layout(pad=0.2)
     if inps.save_fig:
-        fig.savefig(figNames[3], bbox_inches='tight', transparent=True, dpi=inps.fig_dpi)
-        print('save figure to {}'.format(figNames[3]))
+        fig.savefig(fig_name, transparent=True, dpi=inps.fig_dpi)
+        print('save figure to {}'.format(fig_name))
+    if not inps.disp_fig:
+        plt.close(fig)
+    return fig_name
+
+
+##########################  Main Function  ##############################
+def main(iargs=None):
+    inps = cmd_line_parse(iargs)
+    if inps.list_only:
+        return
+
+    # Plot
+    inps.cbar_label = 'Average Spatial Coherence'
+    figNames = [i+inps.fig_ext for i in ['bperpHistory', 'coherenceMatrix', 'coherenceHistory', 'network']]
+    if inps.cohList is None:
+        figNames = [figNames[0], figNames[3]]
+
+    # rasterize the dots/lines of dense network, to keep the vector figure file small and fast to write
+    inps.rasterized = len(inps.date12List) > 5000
+    if inps.save_fig and inps.fig_ext == '.pdf' and len(inps.date12List) > 2000:
+        print('dense network with {} interferograms, use --figext .png for faster writing'.format(len(inps.date12List)))
+
+    # render the independent figures in parallel for dense network without display,
+    # where the plotting time outweighs the overhead of starting the processes
+    num_worker = min(len(figNames), os.cpu_count() or 1)
+    if not inps.disp_fig and num_worker > 1 and len(inps.date12List) > 1000:
+        print('plot {} figures in parallel with {} processes'.format(len(figNames), num_worker))
+        with ProcessPoolExecutor(max_workers=num_worker) as executor:
+            list(executor.map(plot_figure, [inps] * len(figNames), figNames))
+    else:
+        for fig_name in figNames:
+            plot_figure(inps, fig_name)
 
     if inps.disp_fig:
         print('showing ...')
@@ -459,13 +459,15 @@ def threshold_temporal_baseline(date12_list, btemp_max, keep_seasonal=True, btem
     return date12_list_out
 
 
-def coherence_matrix(date12_list, coh_list, diag_value=np.nan, fill_triangle='both', date_list=None):
+def coherence_matrix(date12_list, coh_list, diag_value=np.nan, fill_triangle='both', date_list=None,
+                     dtype=np.float64):
     """Return coherence matrix based on input date12 list and its coherence
     Inputs:
         date12_list - list of string in YYMMDD-YYMMDD format
         coh_list    - list of float, average coherence for each interferograms
         diag_value  - number, value to be filled in the diagonal
         fill_triangle - str, 'both', 'upper', 'lower'
+        dtype       - data type of the output matrix, e.g. np.float32 to save memory for display
     Output:
         coh_matrix  - 2D np.array with dimension length = date num
                       np.nan value for interferograms non-existed.
@@ -480,21 +482,21 @@ def coherence_matrix(date12_list, coh_list, diag_value=np.nan, fill_triangle='bo
     date_list = ptime.yymmdd(date_list)
     date_num = len(date_list)
 
-    coh_mat = np.zeros([date_num, date_num])
-    coh_mat[:] = np.nan
-    for date12 in date12_list:
-        date1, date2 = date12.split('-')
-        idx1 = date_list.index(date1)
-        idx2 = date_list.index(date2)
-        coh = coh_list[date12_list.index(date12)]
-        if fill_triangle in ['upper', 'both']:
-            coh_mat[idx1, idx2] = coh  # symmetric
-        if fill_triangle in ['lower', 'both']:
-            coh_mat[idx2, idx1] = coh
+    # index of date1/2 for each interferogram
+    date_idx_dict = {date: i for i, date in enumerate(date_list)}
+    date12_idx = np.array([[date_idx_dict[i] for i in date12.split('-')] for date12 in date12_list],
+                          dtype=np.int64).reshape(-1, 2)
+    idx1, idx2 = date12_idx[:, 0], date12_idx[:, 1]
+    coh_list = np.asarray(coh_list, dtype=dtype).reshape(-1)
+
+    coh_mat = np.full((date_num, date_num), np.nan, dtype=dtype)
+    if fill_triangle in ['upper', 'both']:
+        coh_mat[idx1, idx2] = coh_list  # symmetric
+    if fill_triangle in ['lower', 'both']:
+        coh_mat[idx2, idx1] = coh_list
 
     if diag_value is not np.nan:
-        for i in range(date_num):    # diagonal value
-            coh_mat[i, i] = diag_value
+        np.fill_diagonal(coh_mat, diag_value)
     return coh_mat
 
 
@@ -496,6 +496,7 @@ def plot_network(ax, date12List, dateList, pbaseList, p_dict={}, date12List_drop
                       colormap : string, colormap name
                       disp_title : bool, show figure title or not, default: True
                       disp_drop: bool, show dropped interferograms or not, default: True
+                      rasterized : bool, rasterize the dots/lines in vector output, default: False
     Output
         ax : matplotlib axes object
     """
@@ -518,6 +519,7 @@ def plot_network(ax, date12List, dateList, pbaseList, p_dict={}, date12List_drop
     if 'disp_legend' not in p_dict.keys():  p_dict['disp_legend'] = True
     if 'every_year'  not in p_dict.keys():  p_dict['every_year']  = 1
     if 'number'      not in p_dict.keys():  p_dict['number']      = None
+    if 'rasterized'  not in p_dict.keys():  p_dict['rasterized']  = False
 
     # support input colormap: string for colormap name, or colormap object directly
     if isinstance(p_dict['colormap'], str):
@@ -536,34 +538,29 @@ def plot_network(ax, date12List, dateList, pbaseList, p_dict={}, date12List_drop
     tbaseList = ptime.date_list2tbase(dateList)[0]
 
     ## maxBperp and maxBtemp
+    # parse date12 into the index of date1/2 once, and re-use it for the baselines and lines below
     date12List = ptime.yyyymmdd_date12(date12List)
-    ifgram_num = len(date12List)
-    pbase12 = np.zeros(ifgram_num)
-    tbase12 = np.zeros(ifgram_num)
-    for i in range(ifgram_num):
-        m_date, s_date = date12List[i].split('_')
-        m_idx = dateList.index(m_date)
-        s_idx = dateList.index(s_date)
-        pbase12[i] = pbaseList[s_idx] - pbaseList[m_idx]
-        tbase12[i] = tbaseList[s_idx] - tbaseList[m_idx]
+    date_idx_dict = {date: i for i, date in enumerate(dateList)}
+    date12_idx_dict = {date12: i for i, date12 in enumerate(date12List)}
+    date12_idx = np.array([[date_idx_dict[i] for i in date12.split('_')] for date12 in date12List],
+                          dtype=np.int64).reshape(-1, 2)
+    pbase_arr = np.array(pbaseList, dtype=np.float64)
+    tbase_arr = np.array(tbaseList, dtype=np.float64)
+    pbase12 = pbase_arr[date12_idx[:, 1]] - pbase_arr[date12_idx[:, 0]]
+    tbase12 = tbase_arr[date12_idx[:, 1]] - tbase_arr[date12_idx[:, 0]]
     if print_msg:
         print('max perpendicular baseline: {:.2f} m'.format(np.max(np.abs(pbase12))))
         print('max temporal      baseline: {} days'.format(np.max(tbase12)))
 
     ## Keep/Drop - date12
     date12List_keep = sorted(list(set(date12List) - set(date12List_drop)))
-    idx_date12_keep = [date12List.index(i) for i in date12List_keep]
-    idx_date12_drop = [date12List.index(i) for i in date12List_drop]
     if not date12List_drop:
         p_dict['disp_drop'] = False
 
     ## Keep/Drop - date
-    m_dates = [i.split('_')[0] for i in date12List_keep]
-    s_dates = [i.split('_')[1] for i in date12List_keep]
-    dateList_keep = ptime.yyyymmdd(sorted(list(set(m_dates + s_dates))))
-    dateList_drop = sorted(list(set(dateList) - set(dateList_keep)))
-    idx_date_keep = [dateList.index(i) for i in dateList_keep]
-    idx_date_drop = [dateList.index(i) for i in dateList_drop]
+    idx_date12_keep = [date12_idx_dict[i] for i in date12List_keep]
+    idx_date_keep = np.unique(date12_idx[idx_date12_keep]).tolist()
+    idx_date_drop = sorted(set(range(len(dateList))) - set(idx_date_keep))
 
     # Ploting
     if cohList is not None:
@@ -584,48 +581,45 @@ def plot_network(ax, date12List, dateList, pbaseList, p_dict={}, date12List_drop
             cbar.set_label(p_dict['cbar_label'], fontsize=p_dict['fontsize'])
 
         # plot low coherent ifgram first and high coherence ifgram later
-        cohList_keep = [cohList[date12List.index(i)] for i in date12List_keep]
+        cohList_keep = [cohList[date12_idx_dict[i]] for i in date12List_keep]
         date12List_keep = [x for _, x in sorted(zip(cohList_keep, date12List_keep))]
 
     # Dot - SAR Acquisition
     if idx_date_keep:
         x_list = [dates[i] for i in idx_date_keep]
         y_list = [pbaseList[i] for i in idx_date_keep]
-        ax.plot(x_list, y_list, 'ko', alpha=0.7, ms=p_dict['markersize'], mfc=p_dict['markercolor'])
+        ax.plot(x_list, y_list, 'ko', alpha=0.7, ms=p_dict['markersize'], mfc=p_dict['markercolor'],
+                rasterized=p_dict['rasterized'])
     if idx_date_drop:
         x_list = [dates[i] for i in idx_date_drop]
         y_list = [pbaseList[i] for i in idx_date_drop]
-        ax.plot(x_list, y_list, 'ko', alpha=0.7, ms=p_dict['markersize'], mfc='gray')
+        ax.plot(x_list, y_list, 'ko', alpha=0.7, ms=p_dict['markersize'], mfc='gray',
+                rasterized=p_dict['rasterized'])
 
     ## Line - Pair/Interferogram
-    # interferograms dropped
+    # draw all pairs of the same line style as one LineCollection, instead of one Line2D per pair
+    date_nums = mdates.date2num(dates)
+
+    # interferograms dropped first, then the kept ones on top
+    date12_groups = [(date12List_keep, 'solid')]
     if p_dict['disp_drop']:
-        for date12 in date12List_drop:
-            date1, date2 = date12.split('_')
-            idx1 = dateList.index(date1)
-            idx2 = dateList.index(date2)
-            x = np.array([dates[idx1], dates[idx2]])
-            y = np.array([pbaseList[idx1], pbaseList[idx2]])
-            if cohList is not None:
-                coh = cohList[date12List.index(date12)]
-                coh_norm = (coh - disp_min) / (disp_max - disp_min)
-                ax.plot(x, y, '--', lw=p_dict['linewidth'], alpha=transparency, c=cmap(coh_norm))
-            else:
-                ax.plot(x, y, '--', lw=p_dict['linewidth'], alpha=transparency, c='k')
-
-    # interferograms kept
-    for date12 in date12List_keep:
-        date1, date2 = date12.split('_')
-        idx1 = dateList.index(date1)
-        idx2 = dateList.index(date2)
-        x = np.array([dates[idx1], dates[idx2]])
-        y = np.array([pbaseList[idx1], pbaseList[idx2]])
+        date12_groups.insert(0, (date12List_drop, 'dashed'))
+
+    for date12s, line_style in date12_groups:
+        if len(date12s) == 0:
+            continue
+        idx_date12 = [date12_idx_dict[i] for i in date12s]
+        idx = date12_idx[idx_date12]
+        segs = np.stack([date_nums[idx], pbase_arr[idx]], axis=-1)
         if cohList is not None:
-            coh = cohList[date12List.index(date12)]
-            coh_norm = (coh - disp_min) / (disp_max - disp_min)
-            ax.plot(x, y, '-', lw=p_dict['linewidth'], alpha=transparency, c=cmap(coh_norm))
+            coh = np.array([cohList[i] for i in idx_date12])
+            colors = cmap((coh - disp_min) / (disp_max - disp_min))
         else:
-            ax.plot(x, y, '-', lw=p_dict['linewidth'], alpha=transparency, c='k')
+            colors = 'k'
+        lines = mpl.collections.LineCollection(segs, colors=colors, linestyles=line_style,
+                                               linewidths=p_dict['linewidth'], alpha=transparency,
+                                               rasterized=p_dict['rasterized'], zorder=2)
+        ax.add_collection(lines)
 
     if p_dict['disp_title']:
         ax.set_title('Interferogram Network', fontsize=p_dict['fontsize'])
@@ -685,12 +679,9 @@ def plot_perp_baseline_hist(ax, dateList, pbaseList, p_dict={}, dateList_drop=[]
 
     # Get index of date used and dropped
     # dateList_drop = ['20080711', '20081011']  # for debug
-    idx_keep = list(range(len(dateList)))
-    idx_drop = []
-    for i in dateList_drop:
-        idx = dateList.index(i)
-        idx_keep.remove(idx)
-        idx_drop.append(idx)
+    date_idx_dict = {date: i for i, date in enumerate(dateList)}
+    idx_drop = [date_idx_dict[i] for i in dateList_drop]
+    idx_keep = sorted(set(range(len(dateList))) - set(idx_drop))
 
     # Plot
     # ax=fig.add_subplot(111)
@@ -806,17 +797,17 @@ def plot_coherence_matrix(ax, date12List, cohList, date12List_drop=[], p_dict={}
         raise ValueError('unrecognized colormap input: {}'.format(p_dict['colormap']))
 
     date12List = ptime.yyyymmdd_date12(date12List)
-    coh_mat = pnet.coherence_matrix(date12List, cohList)
+    coh_mat = pnet.coherence_matrix(date12List, cohList, dtype=np.float32)
 
     if date12List_drop:
         # Date Convert
         m_dates = [i.split('_')[0] for i in date12List]
         s_dates = [i.split('_')[1] for i in date12List]
         dateList = sorted(list(set(m_dates + s_dates)))
+        date_idx_dict = {date: i for i, date in enumerate(dateList)}
         # Set dropped pairs' value to nan, in upper triangle only.
-        for date12 in date12List_drop:
-            idx1, idx2 = [dateList.index(i) for i in date12.split('_')]
-            coh_mat[idx1, idx2] = np.nan
+        idx_drop = np.array([[date_idx_dict[i] for i in date12.split('_')] for date12 in date12List_drop])
+        coh_mat[idx_drop[:, 0], idx_drop[:, 1]] = np.nan
 
     # Show diagonal value as black, to be distinguished from un-selected interferograms
     diag_mat = np.diag(np.ones(coh_mat.shape[0]))